@@ -8,26 +8,146 @@ larger project to keep unit tests self contained.
 """
 from __future__ import annotations
 
-from collections import defaultdict
-from numbers import Number
-from typing import Any, Callable, Dict, Iterable, List, Sequence, Set, Tuple
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from numbers import Number, Real
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Sequence,
+    Set,
+    Tuple,
+)
 import logging
+import math
+import warnings
+
+import numpy as np
 
 
 logger = logging.getLogger(__name__)
 
+# Placeholder for packed slots whose node has not been given a value (or was
+# deleted); such nodes are absent from :attr:`ConstraintLattice.nodes`.
+_MISSING: Any = object()
+
+# Fewest perturbed inputs at which one vectorised call to a constraint beats
+# calling it once per point.  Below this the NumPy set-up dominates: measured
+# over whole linear solves, the scalar loop is 3-5x faster at 1-4 inputs and
+# level with batching at 24-32 (single output) or 64 (tuple outputs); at 128
+# inputs batching is 1.2-1.5x faster.
+_BATCH_MIN_INPUTS = 64
+
+
+def _state_key(value: Any) -> Any:
+    """Return the hashable key used to fingerprint a node value."""
+    if isinstance(value, Number):
+        return round(value, 6)
+    return value
+
+
+def _damped_fixed_point(
+    values: Any,
+    kernels: Tuple[Callable[[Any], Any], ...],
+    in_ptr: Any,
+    in_nodes: Any,
+    out_ptr: Any,
+    out_nodes: Any,
+    tolerance: float,
+    iteration_limit: int,
+) -> int:
+    """Run the damped fixed-point iteration over packed node ``values``.
+
+    Constraint ``c`` reads ``values[in_nodes[in_ptr[c]:in_ptr[c + 1]]]`` and
+    writes to ``out_nodes[out_ptr[c]:out_ptr[c + 1]]``.  ``values`` is updated
+    in place and the number of iterations performed is returned.  The body is
+    restricted to what Numba's ``nopython`` mode supports so that it can be
+    compiled by :func:`_numeric_fixed_point`.
+    """
+    for iteration in range(iteration_limit):
+        max_delta = 0.0
+        for c in range(len(kernels)):
+            targets = out_nodes[out_ptr[c] : out_ptr[c + 1]]
+            if targets.size == 0:
+                continue
+            new_vals = kernels[c](values[in_nodes[in_ptr[c] : in_ptr[c + 1]]])
+            # Damp the constraint's whole output vector with array ufuncs;
+            # constraints still run in order so later ones see the update.
+            old_vals = values[targets]
+            updated = old_vals + 0.5 * (new_vals - old_vals)
+            deltas = np.abs(updated - old_vals)
+            moved = deltas > tolerance
+            values[targets[moved]] = updated[moved]
+            max_delta = max(max_delta, deltas.max())
+        if max_delta <= tolerance:
+            return iteration + 1
+    return iteration_limit
+
+
+@cache
+def _load_njit() -> Callable[..., Any] | None:
+    """Return :func:`numba.njit` when Numba is installed, else ``None``."""
+    try:
+        from numba import njit
+        from numba.core.errors import NumbaExperimentalFeatureWarning
+    except ImportError:  # pragma: no cover - Numba is optional
+        return None
+    # Tuples of compiled kernels rely on first-class function types.
+    warnings.filterwarnings(
+        "ignore",
+        message="First-class function type feature is experimental",
+        category=NumbaExperimentalFeatureWarning,
+    )
+    return njit
+
+
+@cache
+def _numeric_fixed_point() -> Callable[..., int]:
+    """Return :func:`_damped_fixed_point`, JIT-compiled when Numba is present."""
+    njit = _load_njit()
+    if njit is None:  # pragma: no cover - Numba is optional
+        return _damped_fixed_point
+    # ``nogil`` lets independent numeric SCCs run in parallel threads.
+    return njit(nogil=True)(_damped_fixed_point)
+
 
 class ConstraintLattice:
     """Minimal constraint lattice for propagating values between nodes."""
 
     def __init__(self) -> None:
         self.nodes: Dict[str, Any] = {}
+        # While propagating, node values are copied into a packed list so
+        # constraints can address them by the integer slots resolved in
+        # ``add_constraint``.  Slots are allocated once per node ID and never
+        # move.
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._values: List[Any] = []
         self.constraints: List[Dict[str, Any]] = []
+        # Bumped whenever a constraint is registered; ``_topology`` reuses its
+        # cached SCC decomposition while the version is unchanged.
+        self._topology_version = 0
+        self._topology_cache: Tuple[Any, ...] | None = None
 
     def add_node(self, node_id: str, value: Any | None = None) -> None:
         """Add a node to the lattice."""
         self.nodes[node_id] = value
 
+    def _node_slot(self, node_id: str) -> int:
+        """Return the packed index of ``node_id``, allocating it if needed."""
+        idx = self._node_index.get(node_id)
+        if idx is None:
+            idx = len(self._node_ids)
+            self._node_ids.append(node_id)
+            self._node_index[node_id] = idx
+            self._values.append(_MISSING)
+        return idx
+
     def add_constraint(
         self,
         constraint_func: Callable[..., Any],
@@ -36,197 +156,661 @@ class ConstraintLattice:
         outputs: Sequence[str],
     ) -> None:
         """Register a new constraint function."""
+        self._append_constraint(constraint_func, inputs, outputs)
+
+    def add_linear_constraint(
+        self,
+        coeffs: Mapping[str, float],
+        const: float = 0.0,
+        *,
+        outputs: Sequence[str],
+    ) -> None:
+        """Register ``output = const + sum(coeff * node)`` for each output.
+
+        The Jacobian is known up front, so linear solves assemble this
+        constraint's rows straight from ``coeffs`` without evaluating it.
+        """
+        inputs = list(coeffs)
+        weights = [float(coeffs[node]) for node in inputs]
+        const = float(const)
+
+        def evaluate(*args: Any) -> Any:
+            value = const + sum(w * x for w, x in zip(weights, args, strict=True))
+            return value if len(outputs) == 1 else (value,) * len(outputs)
+
+        jacobian = np.repeat(np.array(weights, dtype=float)[:, None], len(outputs), axis=1)
+        constant = np.full(len(outputs), const)
+        self._append_constraint(evaluate, inputs, outputs, linear=(jacobian, constant))
+
+    def register_numeric_constraint(
+        self,
+        kernel: Callable[[Any], Any],
+        *,
+        inputs: Sequence[str],
+        outputs: Sequence[str],
+    ) -> None:
+        """Register a purely numeric constraint written as an array kernel.
+
+        ``kernel`` receives a 1-D ``float64`` array holding the values of
+        ``inputs`` (in order) and must return a 1-D ``float64`` array with one
+        entry per output.  When Numba is installed the kernel is compiled with
+        ``njit`` and SCCs made up solely of numeric constraints are iterated
+        in native code instead of the interpreter.
+        """
+        njit = _load_njit()
+        if njit is not None:
+            from numba import types
+
+            # A fixed signature lets kernels share one first-class function
+            # type, so a whole SCC's kernels fit in a homogeneous tuple.
+            signature = types.float64[:](types.float64[:])
+            py_func = getattr(kernel, "py_func", kernel)
+            try:
+                kernel = njit(signature, cache=True)(py_func)
+            except RuntimeError:  # no cache locator, e.g. defined in a REPL
+                kernel = njit(signature)(py_func)
+
+        def evaluate(*args: Any) -> Tuple[float, ...]:
+            values = np.asarray(args, dtype=np.float64)
+            if values.ndim != 1:
+                raise TypeError("numeric kernels accept scalar inputs only")
+            return tuple(float(v) for v in kernel(values))
+
+        self._append_constraint(evaluate, inputs, outputs, kernel=kernel)
+
+    def _append_constraint(
+        self,
+        func: Callable[..., Any],
+        inputs: Sequence[str],
+        outputs: Sequence[str],
+        **extra: Any,
+    ) -> None:
         self.constraints.append({
-            "func": constraint_func,
+            "func": func,
             "inputs": list(inputs),
             "outputs": list(outputs),
+            "in_idx": tuple(self._node_slot(node) for node in inputs),
+            "out_idx": tuple(self._node_slot(node) for node in outputs),
+            **extra,
         })
+        self._topology_version += 1
 
     # ------------------------------------------------------------------
     # Propagation logic
     # ------------------------------------------------------------------
-    def propagate(self) -> None:
-        """Propagate all constraints until a fixed point is reached."""
-        dep_graph: Dict[str, Set[int]] = defaultdict(set)
+    def propagate(self, max_workers: int | None = None) -> None:
+        """Propagate all constraints until a fixed point is reached.
+
+        When ``max_workers`` is greater than one, SCCs in the same layer of
+        the condensation DAG are solved concurrently on a thread pool.  Each
+        SCC only writes its own outputs, so this is safe; it pays off when
+        constraints release the GIL (NumPy, LAPACK or numeric kernels).
+        """
+        nodes = self.nodes
+        self._values = [nodes.get(node_id, _MISSING) for node_id in self._node_ids]
+        try:
+            self._propagate_packed(max_workers)
+        finally:
+            for node_id, value in zip(self._node_ids, self._values, strict=True):
+                if value is not _MISSING:
+                    nodes[node_id] = value
+
+    def _propagate_packed(self, max_workers: int | None) -> None:
+        """Body of :meth:`propagate`, working on the packed ``_values``."""
+        sccs, constraint_graph, scc_outputs = self._topology()
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        tolerance = 1e-6
+        iteration_limit = 1000
+
+        if max_workers is None or max_workers <= 1 or len(sccs) <= 1:
+            for i, scc in enumerate(sccs):
+                self._solve_scc(
+                    i, scc, scc_outputs[i], tolerance, iteration_limit, debug
+                )
+            return
+
+        numbered = list(enumerate(sccs))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for layer in self._condensation_layers(numbered, constraint_graph, scc_outputs):
+                futures = [
+                    pool.submit(
+                        self._solve_scc,
+                        i,
+                        scc,
+                        scc_outputs[i],
+                        tolerance,
+                        iteration_limit,
+                        debug,
+                    )
+                    for i, scc in layer
+                ]
+                for future in futures:
+                    future.result()
+
+    def _topology(
+        self,
+    ) -> Tuple[List[List[int]], List[List[int]], List[List[int]]]:
+        """Return the SCCs in solve order, the constraint graph and outputs.
+
+        ``outputs[i]`` lists the sorted, distinct output slots of SCC ``i``.
+        Everything here depends only on the registered constraints, so it is
+        rebuilt only after :meth:`add_constraint` (or a direct change to the
+        length of :attr:`constraints`).
+        """
+        key = (self._topology_version, len(self.constraints))
+        if self._topology_cache is not None and self._topology_cache[0] == key:
+            return self._topology_cache[1]
+
+        # Flat adjacency lists: ``dep_graph`` is indexed by node slot and
+        # ``constraint_graph`` by constraint index.
+        dep_graph: List[List[int]] = [[] for _ in self._node_ids]
         for idx, constraint in enumerate(self.constraints):
-            for input_id in constraint["inputs"]:
-                dep_graph[input_id].add(idx)
+            for slot in constraint["in_idx"]:
+                dep_graph[slot].append(idx)
 
-        constraint_graph: Dict[int, Set[int]] = defaultdict(set)
+        constraint_graph: List[List[int]] = [[] for _ in self.constraints]
         for idx, constraint in enumerate(self.constraints):
-            for output_id in constraint["outputs"]:
-                for dependent_idx in dep_graph.get(output_id, set()):
-                    constraint_graph[idx].add(dependent_idx)
+            successors = constraint_graph[idx]
+            for slot in constraint["out_idx"]:
+                successors.extend(dep_graph[slot])
+        constraint_graph = [sorted(set(successors)) for successors in constraint_graph]
 
         sccs = list(reversed(self._tarjan_scc(constraint_graph)))
         logger.debug("found %d SCCs", len(sccs))
-
-        tolerance = 1e-6
-        iteration_limit = 1000
-
-        for i, scc in enumerate(sccs):
-            logger.debug("processing SCC %d: %s", i, scc)
-            variables = sorted(
+        scc_outputs = [
+            sorted(
                 {
-                    node
+                    slot
                     for constraint_idx in scc
-                    for node in self.constraints[constraint_idx]["outputs"]
-                    if node in self.nodes
+                    for slot in self.constraints[constraint_idx]["out_idx"]
                 }
             )
-            var_index = {node: pos for pos, node in enumerate(variables)}
-
-            solved = False
-            rows: List[List[float]] = []
-            constants: List[float] = []
-            if var_index:
-                for constraint_idx in scc:
-                    constraint = self.constraints[constraint_idx]
-                    inputs = constraint["inputs"]
-                    outputs = constraint["outputs"]
-                    baseline_inputs = [
-                        float(self.nodes.get(node, 0.0)) for node in inputs
-                    ]
-                    base_output = constraint["func"](*baseline_inputs)
-                    if not isinstance(base_output, tuple):
-                        base_output = (base_output,)
-
-                    for out_pos, output_id in enumerate(outputs):
-                        if output_id not in var_index:
-                            continue
-                        row = [0.0] * len(var_index)
-                        row[var_index[output_id]] = 1.0
-                        constant = float(base_output[out_pos])
-
-                        for inp_idx, input_id in enumerate(inputs):
-                            if input_id not in var_index:
-                                continue
-                            perturbed = baseline_inputs.copy()
-                            perturbed[inp_idx] += 1.0
-                            perturbed_output = constraint["func"](*perturbed)
-                            if not isinstance(perturbed_output, tuple):
-                                perturbed_output = (perturbed_output,)
-                            delta = float(
-                                perturbed_output[out_pos] - base_output[out_pos]
-                            )
-                            row[var_index[input_id]] -= delta
-                            constant -= delta * baseline_inputs[inp_idx]
-
-                        rows.append(row)
-                        constants.append(constant)
-
-                if rows:
-                    import numpy as np
-
-                    A = np.array(rows, dtype=float)
-                    b = np.array(constants, dtype=float)
-                    try:
-                        if np.linalg.matrix_rank(A) == len(var_index):
-                            solution, *_ = np.linalg.lstsq(A, b, rcond=None)
-                            for node, idx in var_index.items():
-                                self.nodes[node] = float(round(solution[idx], 6))
-                            solved = True
-                        else:
-                            solved = False
-                    except np.linalg.LinAlgError:
-                        solved = False
-
-            if solved:
-                continue
+            for scc in sccs
+        ]
+
+        topology = (sccs, constraint_graph, scc_outputs)
+        self._topology_cache = (key, topology)
+        return topology
 
-            seen_states: Set[Tuple[Tuple[str, Any], ...]] = set()
-            iteration = 0
-            while True:
-                state_key = tuple(sorted(self.nodes.items()))
-                if state_key in seen_states:
+    def _solve_scc(
+        self,
+        i: int,
+        scc: Sequence[int],
+        output_slots: Sequence[int],
+        tolerance: float,
+        iteration_limit: int,
+        debug: bool,
+    ) -> None:
+        """Settle the outputs of one SCC, touching no other node."""
+        if debug:
+            logger.debug("processing SCC %d: %s", i, scc)
+        if len(scc) == 1 and self._assign_directly(self.constraints[scc[0]]):
+            return
+        values = self._values
+        variables = [slot for slot in output_slots if values[slot] is not _MISSING]
+        var_index = {slot: pos for pos, slot in enumerate(variables)}
+
+        solved = False
+        rows: List[Any] = []
+        constants: List[float] = []
+        if var_index:
+            for constraint_idx in scc:
+                constraint = self.constraints[constraint_idx]
+                in_idx = constraint["in_idx"]
+                out_slots = [
+                    (out_pos, var_index[slot])
+                    for out_pos, slot in enumerate(constraint["out_idx"])
+                    if slot in var_index
+                ]
+                if not out_slots:
+                    continue
+
+                baseline = [
+                    0.0 if values[slot] is _MISSING else float(values[slot]) for slot in in_idx
+                ]
+                in_slots = [
+                    inp_idx for inp_idx, slot in enumerate(in_idx) if slot in var_index
+                ]
+                in_cols = [var_index[in_idx[inp_idx]] for inp_idx in in_slots]
+                base_output, deltas = self._linearise(
+                    constraint, baseline, in_slots
+                )
+
+                for out_pos, var_pos in out_slots:
+                    row = [0.0] * len(var_index)
+                    row[var_pos] = 1.0
+                    constant = base_output[out_pos]
+                    # ``-=`` accumulates when an input is repeated.
+                    for inp_idx, col, delta_row in zip(in_slots, in_cols, deltas, strict=True):
+                        delta = delta_row[out_pos]
+                        row[col] -= delta
+                        constant -= delta * baseline[inp_idx]
+                    rows.append(row)
+                    constants.append(constant)
+
+            if rows:
+                A = np.array(rows, dtype=float)
+                b = np.array(constants, dtype=float)
+                # Solve for the minimum-norm correction to the current values
+                # so a rank-deficient system still yields the fixed point
+                # nearest to where the lattice already is.
+                current = np.array(
+                    [
+                        float(value)
+                        if isinstance(value, Real) and not isinstance(value, bool)
+                        else 0.0
+                        for value in (values[slot] for slot in variables)
+                    ],
+                    dtype=float,
+                )
+                try:
+                    correction, rank = self._least_squares(A, b - A @ current)
+                except (np.linalg.LinAlgError, ValueError):
+                    solved = False
+                else:
+                    solution = current + correction
+                    solved = rank == len(var_index)
+                    for slot, idx in var_index.items():
+                        if solved:
+                            values[slot] = float(round(solution[idx], 6))
+                        elif math.isfinite(solution[idx]):
+                            # Warm-start the damped loop below.
+                            values[slot] = float(solution[idx])
+
+        if solved:
+            return
+
+        if self._propagate_numeric(scc, tolerance, iteration_limit):
+            return
+
+        # Only this SCC's outputs change inside the loop, so an XOR of
+        # per-node hashes over them identifies the state and can be
+        # updated incrementally on every write.
+        scc_outputs = output_slots
+        state_hash = 0
+        for slot in scc_outputs:
+            old_val = values[slot]
+            state_hash ^= hash((slot, _state_key(None if old_val is _MISSING else old_val)))
+        # Reading an unset node raises KeyError, as it does through ``nodes``.
+        check_missing = any(
+            values[slot] is _MISSING
+            for constraint_idx in scc
+            for slot in self.constraints[constraint_idx]["in_idx"]
+        )
+
+        seen_states: Set[int] = set()
+        iteration = 0
+        while True:
+            if state_hash in seen_states:
+                if debug:
                     logger.debug("  detected repeating state; breaking")
-                    break
-                seen_states.add(state_key)
+                break
+            seen_states.add(state_hash)
 
-                iteration += 1
-                if iteration > iteration_limit:
+            iteration += 1
+            if iteration > iteration_limit:
+                if debug:
                     logger.debug("  iteration limit reached; breaking")
-                    break
-                changed = False
+                break
+            # Largest damped step this sweep; non-numeric changes count as
+            # unbounded so the sweep repeats until they settle too.
+            max_delta = 0.0
+            if debug:
                 logger.debug("  iteration %d", iteration)
-                for constraint_idx in scc:
-                    constraint = self.constraints[constraint_idx]
-                    input_vals = [self.nodes[i] for i in constraint["inputs"]]
-                    output_vals = constraint["func"](*input_vals)
-                    if not isinstance(output_vals, tuple):
-                        output_vals = (output_vals,)
-                    for j, output_id in enumerate(constraint["outputs"]):
-                        old_val = self.nodes.get(output_id)
-                        new_val = output_vals[j]
-
-                        if old_val is None or not isinstance(old_val, Number):
-                            if old_val != new_val:
+            for constraint_idx in scc:
+                constraint = self.constraints[constraint_idx]
+                input_vals = [values[slot] for slot in constraint["in_idx"]]
+                if check_missing:
+                    for slot, value in zip(constraint["in_idx"], input_vals, strict=True):
+                        if value is _MISSING:
+                            raise KeyError(self._node_ids[slot])
+                output_vals = constraint["func"](*input_vals)
+                if not isinstance(output_vals, tuple):
+                    output_vals = (output_vals,)
+                for j, slot in enumerate(constraint["out_idx"]):
+                    old_val = values[slot]
+                    if old_val is _MISSING:
+                        old_val = None
+                    new_val = output_vals[j]
+
+                    if old_val is None or not isinstance(old_val, Number):
+                        if old_val != new_val:
+                            if debug:
                                 logger.debug(
-                                    "    updating %s from %r to %r", output_id, old_val, new_val
+                                    "    updating %s from %r to %r",
+                                    self._node_ids[slot],
+                                    old_val,
+                                    new_val,
                                 )
-                                self.nodes[output_id] = new_val
-                                changed = True
+                            state_hash ^= hash((slot, _state_key(old_val)))
+                            state_hash ^= hash((slot, _state_key(new_val)))
+                            values[slot] = new_val
+                            max_delta = math.inf
+                        continue
+
+                    if isinstance(new_val, Number):
+                        updated_val = old_val + 0.5 * (new_val - old_val)
+                        delta = abs(updated_val - old_val)
+                        if delta <= tolerance:
                             continue
+                    else:
+                        updated_val = new_val
+                        delta = math.inf
 
-                        if isinstance(new_val, Number):
-                            updated_val = old_val + 0.5 * (new_val - old_val)
-                            if abs(updated_val - old_val) <= tolerance:
-                                continue
-                        else:
-                            updated_val = new_val
-
-                        if updated_val != old_val:
+                    if updated_val != old_val:
+                        if debug:
                             logger.debug(
-                                "    updating %s from %r to %r", output_id, old_val, updated_val
+                                "    updating %s from %r to %r",
+                                self._node_ids[slot],
+                                old_val,
+                                updated_val,
                             )
-                            self.nodes[output_id] = updated_val
-                            changed = True
-
-                if not changed:
-                    break
-
-            for node_id, value in list(self.nodes.items()):
-                if isinstance(value, Number):
-                    self.nodes[node_id] = float(round(value, 6))
+                        state_hash ^= hash((slot, _state_key(old_val)))
+                        state_hash ^= hash((slot, _state_key(updated_val)))
+                        values[slot] = updated_val
+                        max_delta = max(max_delta, delta)
+
+            if debug:
+                logger.debug("  max delta %g", max_delta)
+            if max_delta <= tolerance:
+                break
+
+        for slot in scc_outputs:
+            value = values[slot]
+            if isinstance(value, Number):
+                values[slot] = float(round(value, 6))
+
+    def _assign_directly(self, constraint: Dict[str, Any]) -> bool:
+        """Evaluate a lone single-output constraint straight into its output.
+
+        Its output does not feed back into its inputs, so one evaluation is
+        the exact solution and no linear system is needed.  Returns ``False``
+        for self-referencing constraints or unset inputs, which the general
+        path handles.
+        """
+        out_idx = constraint["out_idx"]
+        in_idx = constraint["in_idx"]
+        if len(out_idx) != 1 or out_idx[0] in in_idx:
+            return False
+        input_vals = [self._values[slot] for slot in in_idx]
+        if any(value is _MISSING for value in input_vals):
+            return False
+
+        value = constraint["func"](*input_vals)
+        if isinstance(value, tuple):
+            # Extra entries have no output to go to; the other paths
+            # likewise only read the first.
+            value = value[0]
+        if isinstance(value, Number):
+            value = float(round(value, 6))
+        self._values[out_idx[0]] = value
+        return True
+
+    @staticmethod
+    def _condensation_layers(
+        sccs: Sequence[Tuple[int, List[int]]],
+        graph: Sequence[Sequence[int]],
+        outputs: Sequence[Sequence[int]],
+    ) -> List[List[Tuple[int, List[int]]]]:
+        """Group topologically ordered ``sccs`` into independent layers.
+
+        Uses Kahn's algorithm on the condensation DAG: an SCC lands in the
+        layer after the deepest SCC it depends on, so SCCs sharing a layer
+        never read each other's outputs and may be solved concurrently.
+        ``outputs[pos]`` lists the output slots of ``sccs[pos]``; SCCs that
+        write the same slot are additionally chained in solve order, so the
+        last writer wins exactly as in a sequential pass.
+        """
+        component = {
+            constraint_idx: pos
+            for pos, (_, scc) in enumerate(sccs)
+            for constraint_idx in scc
+        }
+        successors: List[Set[int]] = [set() for _ in sccs]
+        indegree = [0] * len(sccs)
+
+        def order(src: int, dst: int) -> None:
+            if src != dst and dst not in successors[src]:
+                successors[src].add(dst)
+                indegree[dst] += 1
+
+        for source, targets in enumerate(graph):
+            for target in targets:
+                order(component[source], component[target])
+        last_writer: Dict[int, int] = {}
+        for pos, slots in enumerate(outputs):
+            for slot in slots:
+                if slot in last_writer:
+                    order(last_writer[slot], pos)
+                last_writer[slot] = pos
+
+        layers: List[List[Tuple[int, List[int]]]] = []
+        frontier = [pos for pos, degree in enumerate(indegree) if degree == 0]
+        while frontier:
+            layers.append([sccs[pos] for pos in frontier])
+            next_frontier = []
+            for pos in frontier:
+                for succ in successors[pos]:
+                    indegree[succ] -= 1
+                    if indegree[succ] == 0:
+                        next_frontier.append(succ)
+            frontier = sorted(next_frontier)
+        return layers
+
+    def _propagate_numeric(
+        self, scc: Sequence[int], tolerance: float, iteration_limit: int
+    ) -> bool:
+        """Iterate an SCC of numeric constraints over packed ``float64`` values.
+
+        Returns ``False`` without touching any node when the SCC contains a
+        constraint registered through :meth:`add_constraint` or reads a node
+        that does not hold a real number; the generic loop handles those.
+        """
+        constraints = [self.constraints[idx] for idx in scc]
+        if not all("kernel" in constraint for constraint in constraints):
+            return False
+
+        slots = sorted(
+            {
+                slot
+                for constraint in constraints
+                for slot in (*constraint["in_idx"], *constraint["out_idx"])
+            }
+        )
+        raw_values = [self._values[slot] for slot in slots]
+        if not all(
+            isinstance(value, Real) and not isinstance(value, bool)
+            for value in raw_values
+        ):
+            return False
+
+        position = {slot: pos for pos, slot in enumerate(slots)}
+        in_ptr = np.cumsum([0] + [len(c["in_idx"]) for c in constraints], dtype=np.intp)
+        out_ptr = np.cumsum([0] + [len(c["out_idx"]) for c in constraints], dtype=np.intp)
+        in_nodes = np.array(
+            [position[slot] for c in constraints for slot in c["in_idx"]], dtype=np.intp
+        )
+        out_nodes = np.array(
+            [position[slot] for c in constraints for slot in c["out_idx"]], dtype=np.intp
+        )
+        values = np.array(raw_values, dtype=np.float64)
+        kernels = tuple(constraint["kernel"] for constraint in constraints)
+
+        iterations = _numeric_fixed_point()(
+            values,
+            kernels,
+            in_ptr,
+            in_nodes,
+            out_ptr,
+            out_nodes,
+            tolerance,
+            iteration_limit,
+        )
+        logger.debug("  numeric SCC settled after %d iterations", iterations)
+
+        for slot in {slot for c in constraints for slot in c["out_idx"]}:
+            self._values[slot] = float(round(values[position[slot]], 6))
+        return True
+
+    def _linearise(
+        self, constraint: Dict[str, Any], baseline: List[float], slots: Sequence[int]
+    ) -> Tuple[List[float], List[List[float]]]:
+        """Return the outputs at ``baseline`` and their unit-step deltas.
+
+        The deltas are taken along the inputs listed in ``slots``, one row per
+        slot, as plain lists of floats.  Constraints from
+        :meth:`add_linear_constraint` carry their Jacobian already; the rest
+        are measured by finite differences on every call.  Their Jacobians are
+        not cached: no cheap probe tells affine functions from piecewise-linear
+        ones (relu, clip, abs), and confirming a cached model costs more than
+        the perturbations it would save.
+        """
+        linear = constraint.get("linear")
+        if linear is not None:
+            jacobian, constant = linear
+            outputs = np.asarray(baseline) @ jacobian + constant
+            return outputs.tolist(), jacobian[list(slots)].tolist()
+
+        base_output, *perturbed = self._evaluate_perturbations(
+            constraint["func"], baseline, slots
+        )
+        deltas = [
+            [out - base for out, base in zip(row, base_output, strict=True)]
+            for row in perturbed
+        ]
+        return base_output, deltas
+
+    @staticmethod
+    def _least_squares(A: Any, b: Any) -> Tuple[Any, int]:
+        """Solve ``A x = b`` in the least-squares sense and return ``(x, rank)``.
+
+        SciPy's GELSY driver (pivoted QR) reports the effective rank alongside
+        the solution, so no separate SVD is needed to detect singular systems.
+        Tall systems, with more rows than unknowns, are first factorised with
+        a rank-revealing QR whose ``R`` is reused by a triangular solve when
+        the rank is full.  The rank tolerance matches
+        :func:`numpy.linalg.matrix_rank`.
+        """
+        cond = max(A.shape) * np.finfo(float).eps
+        try:
+            from scipy.linalg import lstsq, qr, solve_triangular
+        except ImportError:  # pragma: no cover - SciPy is optional
+            solution, _, rank, _ = np.linalg.lstsq(A, b, rcond=cond)
+            return solution, int(rank)
+
+        n_rows, n_cols = A.shape
+        # ``qr`` checks ``A`` itself; ``b`` must be checked here because the
+        # triangular solve skips it, and a non-finite system stays unsolved.
+        if n_rows > n_cols and np.isfinite(b).all():
+            Q, R, piv = qr(A, mode="economic", pivoting=True)
+            diagonal = np.abs(np.diag(R))
+            rank = int(np.sum(diagonal > cond * diagonal[0])) if diagonal[0] else 0
+            if rank == n_cols:
+                solution = np.empty(n_cols)
+                solution[piv] = solve_triangular(R, Q.T @ b, check_finite=False)
+                return solution, rank
+
+        # Finite checks stay on: A and b come from user constraint outputs.
+        solution, _, rank, _ = lstsq(A, b, cond=cond, lapack_driver="gelsy")
+        return solution, int(rank)
+
+    @staticmethod
+    def _evaluate_perturbations(
+        func: Callable[..., Any], baseline: List[float], slots: Sequence[int]
+    ) -> List[List[float]]:
+        """Evaluate ``func`` at ``baseline`` and at a unit step along each slot.
+
+        Row ``0`` of the ``len(slots) + 1`` returned rows holds the baseline
+        outputs and row ``j + 1`` the outputs with input ``slots[j]``
+        incremented by one.  ``func`` is called once per point with plain
+        floats.  From :data:`_BATCH_MIN_INPUTS` slots on, all points are first
+        tried in a single call as NumPy arrays; functions that cannot handle
+        array arguments fall back to the scalar loop.
+        """
+        n_points = len(slots) + 1
+        if len(slots) >= _BATCH_MIN_INPUTS:
+            points = np.repeat(np.array([baseline], dtype=float), n_points, axis=0)
+            points[np.arange(1, n_points), list(slots)] += 1.0
+            try:
+                result = func(*points.T)
+                if not isinstance(result, tuple):
+                    result = (result,)
+                columns = [np.asarray(r, dtype=float) for r in result]
+                # Anything but one value per point means ``func`` reduced
+                # across the batch (``np.sum`` over its arguments, say) or
+                # ignored it.
+                if all(column.shape == (n_points,) for column in columns):
+                    return np.column_stack(columns).tolist()
+            except (TypeError, ValueError):
+                pass
+
+        evaluated = []
+        for slot in (None, *slots):
+            point = list(baseline)
+            if slot is not None:
+                point[slot] += 1.0
+            result = func(*point)
+            if not isinstance(result, tuple):
+                result = (result,)
+            evaluated.append([float(r) for r in result])
+        return evaluated
 
     # ------------------------------------------------------------------
     # Tarjan strongly connected components
     # ------------------------------------------------------------------
-    def _tarjan_scc(self, graph: Dict[int, Set[int]]) -> List[List[int]]:
-        index = 0
+    def _tarjan_scc(self, graph: Sequence[Sequence[int]]) -> List[List[int]]:
+        """Return the strongly connected components of ``graph``.
+
+        ``graph[v]`` lists the successors of vertex ``v``.  Iterative form of
+        Tarjan's algorithm: an explicit work stack of ``(node, successor
+        iterator)`` pairs replaces recursion, so deep graphs cannot hit the
+        interpreter's recursion limit, and the per-node bookkeeping lives in
+        flat arrays.
+        """
+        n = len(graph)
+        indices = array("i", [-1]) * n
+        lowlinks = array("i", [0]) * n
+        on_stack = bytearray(n)
         stack: List[int] = []
-        indices: Dict[int, int] = {}
-        lowlinks: Dict[int, int] = {}
-        on_stack: Dict[int, bool] = {}
         sccs: List[List[int]] = []
+        index = 0
 
-        def strongconnect(node: int) -> None:
-            nonlocal index
-            indices[node] = index
-            lowlinks[node] = index
+        for root in range(n):
+            if indices[root] != -1:
+                continue
+            indices[root] = lowlinks[root] = index
             index += 1
-            stack.append(node)
-            on_stack[node] = True
-
-            for neighbor in graph.get(node, set()):
-                if neighbor not in indices:
-                    strongconnect(neighbor)
-                    lowlinks[node] = min(lowlinks[node], lowlinks[neighbor])
-                elif on_stack.get(neighbor):
-                    lowlinks[node] = min(lowlinks[node], indices[neighbor])
-
-            if lowlinks[node] == indices[node]:
-                scc: List[int] = []
-                while True:
-                    w = stack.pop()
-                    on_stack[w] = False
-                    scc.append(w)
-                    if w == node:
-                        break
-                sccs.append(scc)
-
-        for node in graph:
-            if node not in indices:
-                strongconnect(node)
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(graph[root]))]
+
+            while work:
+                node, successors = work[-1]
+                child = next(successors, None)
+                if child is not None:
+                    if indices[child] == -1:
+                        indices[child] = lowlinks[child] = index
+                        index += 1
+                        stack.append(child)
+                        on_stack[child] = 1
+                        work.append((child, iter(graph[child])))
+                    elif on_stack[child]:
+                        lowlinks[node] = min(lowlinks[node], indices[child])
+                    continue
+
+                work.pop()
+                if lowlinks[node] == indices[node]:
+                    scc: List[int] = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        scc.append(w)
+                        if w == node:
+                            break
+                    sccs.append(scc)
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
 
         return sccs
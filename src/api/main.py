@@ -4,9 +4,11 @@
 # See saas/LICENSE-BSL.txt for full terms.
 # Copyright (c) 2025 Lexsight LCC. All rights reserved.
 # See saas/LICENSE-BSL.txt for full terms.
+import asyncio
+import contextlib
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Third-party imports
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, status
@@ -19,6 +21,7 @@ from pydantic import BaseModel, Field, field_validator
 from constraint_lattice.engine.apply import apply_constraints, AuditStep
 from constraint_lattice.constraints.profanity import ProfanityFilter
 from constraint_lattice.constraints.length import LengthConstraint
+from constraint_lattice.constraints.phi2_moderation import ConstraintPhi2Moderation
 from .ws import manager
 
 # Initialize FastAPI app
@@ -50,6 +53,97 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class ModerationBatcher:
+    """Coalesce concurrent moderation requests into batched forward passes.
+
+    Requests arriving within ``window_seconds`` of the first queued one are
+    sent to :meth:`ConstraintPhi2Moderation.apply_constraints_batch` together,
+    so the model runs once per batch rather than once per request.
+    """
+
+    def __init__(
+        self,
+        moderator_factory: Callable[[], ConstraintPhi2Moderation],
+        max_batch_size: int = 32,
+        window_seconds: float = 0.01,
+    ):
+        self._moderator_factory = moderator_factory
+        self._moderator: Optional[ConstraintPhi2Moderation] = None
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Requests the worker has taken off the queue but not yet answered.
+        self._batch: List[Tuple[str, asyncio.Future]] = []
+
+    async def submit(self, text: str) -> Tuple[bool, Optional[str]]:
+        """Queue ``text`` for moderation and wait for its verdict."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop the background worker and fail requests still waiting on it."""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+        # Whatever the worker had dequeued, plus anything still queued,
+        # would otherwise leave its caller awaiting forever.
+        pending = list(self._batch)
+        self._batch = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("moderation batcher closed"))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = self._batch = [await queue.get()]
+            deadline = loop.time() + self.window_seconds
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                if self._moderator is None:
+                    self._moderator = await loop.run_in_executor(
+                        None, self._moderator_factory
+                    )
+                results = await loop.run_in_executor(
+                    None, self._moderator.apply_constraints_batch, texts
+                )
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"moderator returned {len(results)} verdicts for {len(batch)} texts"
+                    )
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for (_, future), result in zip(batch, results, strict=True):
+                    if not future.done():
+                        future.set_result(result)
+
+
+moderation_batcher = ModerationBatcher(ConstraintPhi2Moderation)
+app.router.on_shutdown.append(moderation_batcher.close)
+
+
 class ConstraintRequest(BaseModel):
     """Request model for constraint application.
 
@@ -209,6 +303,40 @@ async def apply_constraints_endpoint(request: ConstraintRequest) -> Dict[str, An
         )
 
 
+class ModerationRequest(BaseModel):
+    """Request model for Phi-2 moderation.
+
+    Attributes:
+        text: Text to classify (max 100,000 characters)
+    """
+    text: str = Field(..., min_length=1, max_length=100_000, description="Text to moderate")
+
+
+class ModerationResponse(BaseModel):
+    """Response model for Phi-2 moderation.
+
+    Attributes:
+        is_safe: Whether the text passed moderation
+        reason: Violation reason when the text was flagged
+    """
+    is_safe: bool = Field(..., description="Whether the text passed moderation")
+    reason: Optional[str] = Field(None, description="Violation reason, if any")
+
+
+@app.post("/api/moderate", response_model=ModerationResponse, status_code=status.HTTP_200_OK)
+async def moderate_endpoint(request: ModerationRequest) -> Dict[str, Any]:
+    """Classify text with Phi-2, batching concurrent requests.
+
+    Args:
+        request: Moderation request containing the text to classify
+
+    Returns:
+        Dictionary containing the ``is_safe`` verdict and an optional ``reason``
+    """
+    is_safe, reason = await moderation_batcher.submit(request.text)
+    return {"is_safe": is_safe, "reason": reason}
+
+
 @app.get("/health")
 async def health_check() -> Dict[str, str]:
     """Health check endpoint.
@@ -2,9 +2,10 @@
 # Copyright (c) 2025 ochoaughini. All rights reserved.
 # See LICENSE for full terms.
 
+import functools
 import logging
 import os
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:
     import torch  # type: ignore
@@ -53,6 +54,28 @@ except ModuleNotFoundError:  # pragma: no cover
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=4)
+def _load_phi2(model_name: str, device: str, quantize: bool) -> Tuple[Any, Any]:
+    """Load (and optionally quantize) the tokenizer and model once per key.
+
+    Instances configured alike share the same weights instead of reloading
+    them from disk on every construction.  The shared tokenizer is set up
+    for batching here, once, rather than by each caller.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+    # Pad on the left so position -1 is every prompt's last real token.
+    if getattr(tokenizer, "pad_token", None) is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    model = AutoModelForCausalLM.from_pretrained(model_name, trust_remote_code=True)
+    if quantize and torch is not None:
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    model = model.to(device)
+    return tokenizer, model
+
+
 class ConstraintPhi2Moderation:
     """
     Content moderation constraint using Microsoft's Phi-2 model
@@ -86,22 +109,17 @@ class ConstraintPhi2Moderation:
         )
 
         if load_real_model:
-            # Initialize tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                model_name, trust_remote_code=True
+            self.tokenizer, self.model = _load_phi2(
+                model_name, self.device, quantize
             )
-            # Initialize model
-            self.model = AutoModelForCausalLM.from_pretrained(
-                model_name, trust_remote_code=True
-            )
-            if quantize and torch is not None:
-                self.model = torch.quantization.quantize_dynamic(
-                    self.model, {torch.nn.Linear}, dtype=torch.qint8
-                )
-            self.model = self.model.to(self.device)
+            # Token ID of the "unsafe" label, looked up once.
+            self._unsafe_id = self.tokenizer.encode(
+                "unsafe", add_special_tokens=False
+            )[0]
         else:  # pragma: no cover - transformers missing or offline stub
             self.tokenizer = None
             self.model = None
+            self._unsafe_id = None
         self.logger = logging.getLogger(__name__)
 
     def apply_constraints(self, text: str) -> Tuple[bool, Optional[str]]:
@@ -110,51 +128,80 @@ class ConstraintPhi2Moderation:
 
         :return: Tuple (is_safe, violation_reason)
         """
+        return self.apply_constraints_batch([text])[0]
+
+    def apply_constraints_batch(
+        self, texts: Sequence[str]
+    ) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Apply Phi-2 moderation to several texts with a single forward pass
+
+        :return: One (is_safe, violation_reason) tuple per input text
+        """
         try:
             if self.tokenizer is None or self.model is None:
-                return True, None
+                return [(True, None) for _ in texts]
 
-            # Prepare moderation prompt
-            prompt = f"Classify the following text as 'safe' or 'unsafe':\n{text}\nClassification:"
+            # Prepare moderation prompts
+            prompts = [
+                f"Classify the following text as 'safe' or 'unsafe':\n{text}\nClassification:"
+                for text in texts
+            ]
 
             # Tokenize and generate
             inputs = self.tokenizer(
-                prompt, return_tensors="pt", truncation=True, max_length=512
+                prompts,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=512,
             )
             if torch is not None:
                 inputs = inputs.to(self.device)
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
+                # Count positions from each prompt's first real token so a
+                # left-padded prompt scores as it would on its own.
+                position_ids = (inputs["attention_mask"].cumsum(-1) - 1).clamp(min=0)
+                with torch.inference_mode():
+                    outputs = self.model(**inputs, position_ids=position_ids)
                     logits = outputs.logits
             else:
                 outputs = self.model(**inputs)
                 logits = outputs.logits
 
-            # Get probabilities for 'safe' and 'unsafe' tokens
-            safe_token_id = self.tokenizer.encode("safe")[0]
-            unsafe_token_id = self.tokenizer.encode("unsafe")[0]
+            # Get probabilities for the 'unsafe' token
+            unsafe_token_id = self._unsafe_id
+            if unsafe_token_id is None:  # tokenizer attached after __init__
+                unsafe_token_id = self.tokenizer.encode(
+                    "unsafe", add_special_tokens=False
+                )[0]
 
-            last_token_logits = logits[0, -1, :]
+            last_token_logits = logits[:, -1, :]
             probs = (
                 torch.softmax(last_token_logits, dim=-1)
                 if torch is not None
                 else last_token_logits.softmax(dim=-1)
             )
 
-            safe_prob = probs[safe_token_id].item()
-            unsafe_prob = probs[unsafe_token_id].item()
+            unsafe_probs = probs[:, unsafe_token_id].tolist()
 
             # Determine safety based on threshold
-            if unsafe_prob > self.safety_threshold:
-                return False, (
-                    f"Unsafe content detected (confidence: {unsafe_prob:.2f})"
-                )
-            return True, None
+            results: List[Tuple[bool, Optional[str]]] = []
+            for unsafe_prob in unsafe_probs:
+                if unsafe_prob > self.safety_threshold:
+                    results.append(
+                        (
+                            False,
+                            f"Unsafe content detected (confidence: {unsafe_prob:.2f})",
+                        )
+                    )
+                else:
+                    results.append((True, None))
+            return results
 
         except Exception as e:
             self.logger.error(f"Phi-2 moderation failed: {str(e)}")
             # Fallback: Return safe but log error
-            return True, None
+            return [(True, None) for _ in texts]
 
     def _analyse(self, text: str) -> Dict[str, Any]:
         is_safe, reason = self.apply_constraints(text)
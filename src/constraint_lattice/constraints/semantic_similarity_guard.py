@@ -2,11 +2,38 @@
 # Copyright (c) 2025 ochoaughini. All rights reserved.
 # See LICENSE for full terms.
 
+import functools
+import math
 import os
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional, Sequence
 
 import numpy as np
 
+
+def _accumulate_py(buf: np.ndarray, out: np.ndarray) -> None:
+    """Add byte ``i`` of ``buf`` into ``out[i % 16]``."""
+    for i in range(buf.size):
+        out[i & 15] += buf[i]
+
+
+@functools.cache
+def _accumulate_kernel() -> Optional[Callable[[np.ndarray, np.ndarray], None]]:
+    """Return the Numba-compiled accumulator, or ``None`` without Numba.
+
+    Numba is imported on first use rather than with this module, keeping it
+    off the import path of every ``constraint_lattice.constraints`` user.
+    """
+    try:
+        from numba import njit
+    except ImportError:  # pragma: no cover - numba optional
+        return None
+    return njit(cache=True)(_accumulate_py)
+
+
+# Encoded vectors kept per guard; the oldest entry is evicted first.
+_VECTOR_CACHE_SIZE = 1024
+
+
 class SemanticSimilarityGuard:
     """
     Vector-space similarity filter.  When a reference embedding is supplied it
@@ -26,10 +53,20 @@ class SemanticSimilarityGuard:
         self._encoder: Optional[Callable[[str], np.ndarray]] = None
         self.model = None
         self.reference_vector: Optional[np.ndarray] = None
+        self._reference_sqnorm = 0.0
+        self._vector_cache: Dict[str, np.ndarray] = {}
 
         if self.active:
             self._encoder = self._load_encoder()
-            self.reference_vector = self._encoder(reference or "")
+            ref = self._encoder(reference or "")
+            self._reference_sqnorm = float(np.vdot(ref, ref))
+            # The reference never changes, so its norm is computed once.
+            # Float embeddings are stored as unit vectors; the fallback's
+            # integer byte sums stay exact for integer dot products.
+            if np.issubdtype(ref.dtype, np.floating) and self._reference_sqnorm:
+                ref = ref / math.sqrt(self._reference_sqnorm)
+                self._reference_sqnorm = 1.0
+            self.reference_vector = ref
 
     def apply(self, text: str) -> bool:
         """
@@ -39,21 +76,59 @@ class SemanticSimilarityGuard:
         if not self.active:
             return True
 
-        input_vector = self._encoder(text) if self._encoder else None
+        input_vector = self._encode_cached(text) if self._encoder else None
         if input_vector is None or self.reference_vector is None:
             return True
 
-        similarity = self._cosine_similarity(input_vector, self.reference_vector)
+        in_sqnorm = float(np.vdot(input_vector, input_vector))
+        den = math.sqrt(in_sqnorm * self._reference_sqnorm)
+        if den == 0.0:
+            similarity = 0.0
+        else:
+            similarity = float(np.vdot(input_vector, self.reference_vector)) / den
         return similarity >= self.threshold
 
+    def apply_many(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Vectorised :meth:`apply`: return one boolean verdict per text, scoring
+        the whole batch with a single matrix-vector product.
+        """
+        if not self.active or self._encoder is None or self.reference_vector is None:
+            return np.ones(len(texts), dtype=bool)
+        if not texts:
+            return np.zeros(0, dtype=bool)
+
+        if self.model is not None:
+            matrix = np.asarray(self.model.encode(list(texts)))
+        else:
+            matrix = np.stack([self._encode_cached(text) for text in texts])
+
+        dens = np.sqrt(
+            np.einsum("ij,ij->i", matrix, matrix).astype(np.float64)
+            * self._reference_sqnorm
+        )
+        similarities = np.divide(
+            (matrix @ self.reference_vector).astype(np.float64),
+            dens,
+            out=np.zeros(len(texts), dtype=np.float64),
+            where=dens != 0.0,
+        )
+        return similarities >= self.threshold
+
     def filter_constraint(self, prompt: str, text: str) -> str:
         """API-compatible wrapper used by the constraint engine tests."""
 
         return text if self.apply(text) else ""
 
-    @staticmethod
-    def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-        return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    def _encode_cached(self, text: str) -> np.ndarray:
+        """Encode ``text``, reusing the vector from an earlier call if any."""
+        vector = self._vector_cache.get(text)
+        if vector is None:
+            vector = self._encoder(text)
+            if len(self._vector_cache) >= _VECTOR_CACHE_SIZE:
+                del self._vector_cache[next(iter(self._vector_cache))]
+            self._vector_cache[text] = vector
+        return vector
 
     def _load_encoder(self) -> Callable[[str], np.ndarray]:
         """Return a sentence embedding callable with an offline fallback."""
@@ -76,13 +151,19 @@ class SemanticSimilarityGuard:
 
     @staticmethod
     def _fallback_encode(text: str) -> np.ndarray:
-        """Map a string to a deterministic embedding without network access."""
+        """Map a string to a deterministic embedding without network access.
 
-        vector = np.zeros(16, dtype=np.float32)
-        for idx, byte in enumerate(text.encode("utf-8")):
-            vector[idx % vector.size] += byte
+        The embedding is the unnormalised ``int64`` sum of the UTF-8 bytes in
+        each of 16 buckets; cosine similarity is scale invariant, so the dot
+        products stay in integer arithmetic and normalisation happens once in
+        the final division.
+        """
 
-        norm = np.linalg.norm(vector)
-        if norm:
-            vector /= norm
-        return vector
+        data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+        accumulate = _accumulate_kernel()
+        if accumulate is not None:
+            vector = np.zeros(16, dtype=np.int64)
+            accumulate(data, vector)
+            return vector
+        buckets = np.arange(data.size, dtype=np.intp) & 15
+        return np.bincount(buckets, weights=data, minlength=16).astype(np.int64)
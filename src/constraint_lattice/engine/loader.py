@@ -2,20 +2,47 @@
 # Copyright (c) 2025 ochoaughini. All rights reserved.
 # See LICENSE for full terms.
 
+import copy
 import importlib
 import json
 import os
 import hashlib
 import inspect
 import re
-from functools import partial
-from typing import Any, List, Tuple, Type
-
-import yaml  # type: ignore
+import threading
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Set, Tuple, Type
 
 from .schema import ConstraintConfig, ConstraintSchema
 from constraint_lattice.engine import Constraint
 
+# orjson only parses JSON configs; hash preimages stay on the stdlib encoder
+# so ``input_hash`` does not depend on which libraries are installed.
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - orjson optional
+    orjson = None
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON with orjson when available, accepting what ``json`` accepts.
+
+    orjson rejects ``NaN``/``Infinity`` and integers wider than 64 bits, so
+    documents it refuses are retried with the stdlib parser; whether a config
+    loads must not depend on orjson being installed.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+# Requested class name -> resolved class, so repeated profile loads skip
+# importlib.  Failures are not cached: an import may succeed on a later try.
+_CLASS_CACHE: Dict[str, Type[Constraint]] = {}
+
 
 def load_constraint_class(class_name: str) -> Type[Constraint]:
     """
@@ -30,15 +57,22 @@ def load_constraint_class(class_name: str) -> Type[Constraint]:
     Raises:
         ImportError: If the class cannot be found.
     """
+    requested = class_name
+    cls = _CLASS_CACHE.get(requested)
+    if cls is not None:
+        return cls
+
     try:
         if "." not in class_name:
             module_name = "constraint_lattice.constraints"
         else:
             module_name, class_name = class_name.rsplit(".", 1)
         module = importlib.import_module(module_name)
-        return getattr(module, class_name)
+        cls = getattr(module, class_name)
     except (ImportError, AttributeError, ValueError) as e:
-        raise ImportError(f"Could not load constraint class {class_name}: {e}")
+        raise ImportError(f"Could not load constraint class {class_name}: {e}") from e
+    _CLASS_CACHE[requested] = cls
+    return cls
 
 
 def _normalise_params(params: dict | None) -> Tuple[Tuple[Any, ...], dict[str, Any]]:
@@ -115,14 +149,38 @@ def load_constraints_from_yaml(
     Returns:
         List of constraint instances.
     """
-    config = _load_yaml(yaml_path)
+    path = os.path.abspath(yaml_path)
+    st = os.stat(path)
+    compiled = _compile_profile(
+        path, st.st_mtime_ns, st.st_size, profile, tuple(search_modules or ())
+    )
+    # Constructors may mutate their parameters; keep the cached copy pristine.
+    return [
+        _instantiate_constraint(constraint_cls, copy.deepcopy(params), engine_hint)
+        for constraint_cls, params, engine_hint in compiled
+    ]
+
+
+@lru_cache(maxsize=32)
+def _compile_profile(
+    path: str,
+    mtime_ns: int,
+    size: int,
+    profile: str,
+    search_modules: Tuple[str, ...],
+) -> Tuple[Tuple[Any, dict, str | None], ...]:
+    """Resolve a profile's entries to ``(class, params, engine)`` triples.
+
+    ``mtime_ns`` and ``size`` only take part in the cache key, so an edited
+    file is compiled afresh.
+    """
+    config = _load_yaml(path)
 
     if profile not in config["profiles"]:
         raise ValueError(f"Profile '{profile}' not found in configuration")
 
     raw_entries = config["profiles"][profile]
-    constraints = []
-    search_modules = search_modules or []
+    compiled = []
 
     for entry in raw_entries:
         if isinstance(entry, str):
@@ -151,30 +209,81 @@ def load_constraints_from_yaml(
                         continue
             if constraint_cls is None:
                 raise
-        constraint = _instantiate_constraint(constraint_cls, params, engine_hint)
-        constraints.append(constraint)
+        compiled.append((constraint_cls, params, engine_hint))
 
-    return constraints
+    return tuple(compiled)
 
 
 _YAML_ESCAPE_FIXER = re.compile(r"\\([^0abtnevfr\"\\/N_LPuxU])")
 
+# Absolute path -> (st_mtime_ns, st_size, parsed document).  A changed mtime or
+# size replaces the entry, so edited files are re-parsed automatically.
+_YAML_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+_YAML_CACHE_LOCK = threading.Lock()
+
+
+_YAML: Any = None
+
+
+def _yaml() -> Any:
+    """Import PyYAML on first use so JSON-only callers never load it."""
+
+    global _YAML
+    if _YAML is None:
+        import yaml  # type: ignore
+
+        _YAML = yaml
+    return _YAML
+
 
 def _load_yaml(path: str) -> Any:
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    cached = _YAML_CACHE.get(key)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        # Callers may mutate the document, so hand each one its own copy.
+        return copy.deepcopy(cached[2])
+
+    document = _parse_yaml(key)
+    with _YAML_CACHE_LOCK:
+        _YAML_CACHE[key] = (st.st_mtime_ns, st.st_size, document)
+    return copy.deepcopy(document)
+
+
+def _parse_yaml(path: str) -> Any:
     with open(path, "r") as fh:
         raw = fh.read()
 
     if not raw:
         return {}
 
-    def _escape(match: re.Match[str]) -> str:
-        return "\\\\" + match.group(1)
+    # Double the backslash of escapes YAML would reject so they stay literal;
+    # most files have none, so check before rewriting.
+    if _YAML_ESCAPE_FIXER.search(raw) is None:
+        sanitized = raw
+    else:
+        sanitized = _YAML_ESCAPE_FIXER.sub(r"\\\\\1", raw)
+    yaml = _yaml()
+    # libyaml's C loader parses several times faster; PyYAML wheels bundle
+    # it, but source builds without libyaml only have the Python SafeLoader.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(sanitized, Loader=loader)
+
+
+def _hash_payload(constraint: ConstraintSchema) -> dict[str, Any]:
+    """Return the JSON-compatible mapping hashed into ``input_hash``."""
 
-    sanitized = _YAML_ESCAPE_FIXER.sub(_escape, raw)
-    return yaml.safe_load(sanitized)
+    model_dump = getattr(constraint, "model_dump", None)
+    if model_dump is None:  # pragma: no cover - pydantic v1
+        return constraint.dict()
+    # ``mode="json"`` converts values such as YAML dates to JSON types while
+    # leaving already JSON-native configs, and hence their hashes, unchanged.
+    return model_dump(mode="json")
 
 
-def load_constraints_from_file(path: str) -> List[ConstraintSchema]:
+def load_constraints_from_file(
+    path: str, _seen: Set[str] | None = None
+) -> List[ConstraintSchema]:
     """
     Load constraints from a YAML or JSON file
 
@@ -184,12 +293,21 @@ def load_constraints_from_file(path: str) -> List[ConstraintSchema]:
     Returns:
         List of validated ConstraintSchema objects
     """
+    # Each file is loaded at most once per top-level call, so shared or
+    # cyclic includes are not re-read, re-parsed and re-hashed.
+    if _seen is None:
+        _seen = set()
+    real_path = os.path.realpath(path)
+    if real_path in _seen:
+        return []
+    _seen.add(real_path)
+
     # Read file
     if path.endswith((".yaml", ".yml")):
         config_data = _load_yaml(path)
     elif path.endswith(".json"):
-        with open(path, "r") as f:
-            config_data = json.load(f)
+        with open(path, "rb") as f:
+            config_data = _json_loads(f.read())
     else:
         raise ValueError("Unsupported file format")
 
@@ -203,7 +321,9 @@ def load_constraints_from_file(path: str) -> List[ConstraintSchema]:
             # Resolve relative paths
             if not os.path.isabs(include_path):
                 include_path = os.path.join(os.path.dirname(path), include_path)
-            included_constraints.extend(load_constraints_from_file(include_path))
+            included_constraints.extend(
+                load_constraints_from_file(include_path, _seen)
+            )
 
         # Merge constraints (deduplicate by name)
         constraint_map = {c.name: c for c in config.constraints}
@@ -213,8 +333,13 @@ def load_constraints_from_file(path: str) -> List[ConstraintSchema]:
         config.constraints = list(constraint_map.values())
 
     # Compute input hash for each constraint
-    for constraint in config.constraints:
-        constraint_json = json.dumps(constraint.dict(), sort_keys=True)
-        constraint.input_hash = hashlib.sha256(constraint_json.encode()).hexdigest()
+    blobs = [
+        json.dumps(_hash_payload(constraint), sort_keys=True).encode()
+        for constraint in config.constraints
+    ]
+    sha256 = hashlib.sha256
+    hashes = [sha256(blob).hexdigest() for blob in blobs]
+    for constraint, digest in zip(config.constraints, hashes, strict=True):
+        constraint.input_hash = digest
 
     return config.constraints
@@ -16,15 +16,24 @@ value, which is sufficient for unit-level smoke checks.
 from __future__ import annotations
 
 import inspect
-from functools import wraps
+from functools import partial, wraps
 from typing import Any, Callable, Iterable, Optional
 
 
+def _apply(func: Callable[[Any], Any], generator: Callable[[], Any]) -> Any:
+    return func(generator())
+
+
 class Strategy:
-    """Minimal callable wrapper that mimics Hypothesis strategies."""
+    """Minimal callable wrapper that mimics Hypothesis strategies.
+
+    Strategies created with ``volatile=False`` promise to return the very same
+    object on every draw, which lets :func:`given` resolve them only once.
+    """
 
-    def __init__(self, generator: Callable[[], Any]):
+    def __init__(self, generator: Callable[[], Any], volatile: bool = True):
         self._generator = generator
+        self._volatile = volatile
 
     def __call__(self) -> Any:
         return self._generator()
@@ -33,7 +42,7 @@ class Strategy:
         return self._generator()
 
     def map(self, func: Callable[[Any], Any]) -> "Strategy":
-        return Strategy(lambda: func(self._generator()))
+        return Strategy(partial(_apply, func, self._generator))
 
 
 def _resolve(value: Any) -> Any:
@@ -59,7 +68,7 @@ class _StrategiesModule:
             default = min_value
         elif max_value is not None:
             default = max_value
-        return Strategy(lambda: default)
+        return Strategy(lambda: default, volatile=False)
 
     def floats(
         self,
@@ -69,11 +78,12 @@ class _StrategiesModule:
         allow_infinity: bool = True,
     ) -> Strategy:
         _ = (allow_nan, allow_infinity)  # parameters kept for signature parity
+        value = 0.0
         if min_value is not None:
-            return Strategy(lambda: float(min_value))
-        if max_value is not None:
-            return Strategy(lambda: float(max_value))
-        return Strategy(lambda: 0.0)
+            value = float(min_value)
+        elif max_value is not None:
+            value = float(max_value)
+        return Strategy(lambda: value, volatile=False)
 
     def text(self, alphabet: Optional[Iterable[str]] = None, **_: Any) -> Strategy:
         if alphabet:
@@ -81,7 +91,7 @@ class _StrategiesModule:
             sample = "".join(alphabet[:3])
         else:
             sample = "example"
-        return Strategy(lambda: sample)
+        return Strategy(lambda: sample, volatile=False)
 
     def lists(
         self,
@@ -89,10 +99,17 @@ class _StrategiesModule:
         min_size: int = 0,
         max_size: Optional[int] = None,
     ) -> Strategy:
+        size = max(min_size, 0)
+        if max_size is not None:
+            size = min(size, max_size)
+
+        if not _is_volatile(strategy):
+            # A constant element is drawn once; each call still gets its own
+            # list so callers may mutate it.
+            value = _resolve(strategy)
+            return Strategy(lambda: [value] * size)
+
         def _generator() -> list[Any]:
-            size = max(min_size, 0)
-            if max_size is not None:
-                size = min(size, max_size)
             return [_resolve(strategy) for _ in range(size)]
 
         return Strategy(_generator)
@@ -100,24 +117,55 @@ class _StrategiesModule:
     def sampled_from(self, population: Iterable[Any]) -> Strategy:
         population = list(population)
         if not population:
-            return Strategy(lambda: None)
-        return Strategy(lambda: population[0])
+            return Strategy(lambda: None, volatile=False)
+        first = population[0]
+        return Strategy(lambda: first, volatile=False)
 
 
 strategies = _StrategiesModule()
 
 
+def _is_volatile(value: Any) -> bool:
+    return getattr(value, "_volatile", True)
+
+
 def given(*given_args: Strategy, **given_kwargs: Strategy) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """Decorator that feeds deterministic data produced by the stub strategies."""
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
-        @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            positional = [
-                _resolve(arg) for arg in given_args
-            ]
-            keyword = {key: _resolve(value) for key, value in given_kwargs.items()}
-            return func(*args, *positional, **keyword, **kwargs)
+        # Strategies that always yield the same object are drawn once here;
+        # only volatile ones are re-resolved on each call.
+        positional = [
+            arg if _is_volatile(arg) else _resolve(arg) for arg in given_args
+        ]
+        keyword = {
+            key: value if _is_volatile(value) else _resolve(value)
+            for key, value in given_kwargs.items()
+        }
+        volatile_positions = [
+            index for index, arg in enumerate(given_args) if _is_volatile(arg)
+        ]
+        volatile_keys = [
+            key for key, value in given_kwargs.items() if _is_volatile(value)
+        ]
+
+        if not volatile_positions and not volatile_keys:
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                return func(*args, *positional, **keyword, **kwargs)
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                drawn_args = list(positional)
+                for index in volatile_positions:
+                    drawn_args[index] = _resolve(given_args[index])
+                drawn_kwargs = dict(keyword)
+                for key in volatile_keys:
+                    drawn_kwargs[key] = _resolve(given_kwargs[key])
+                return func(*args, *drawn_args, **drawn_kwargs, **kwargs)
 
         wrapper.__signature__ = inspect.Signature()  # type: ignore[attr-defined]
         return wrapper
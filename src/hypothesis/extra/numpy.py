@@ -8,17 +8,38 @@ import numpy as np
 
 from .. import Strategy, _resolve
 
+# Shared read-only zero arrays keyed by ``(shape, dtype.str)``.
+_ARR_CACHE: dict[tuple, np.ndarray] = {}
+
+
+def _zeros(shape: Tuple[int, ...], dtype: Any, readonly: bool) -> np.ndarray:
+    if not readonly:
+        # ``np.zeros`` hands back calloc'd memory, which is cheaper than both
+        # ``np.full`` and copying a cached template.
+        return np.zeros(shape, dtype=dtype)
+    key = (shape, np.dtype(dtype).str)
+    array = _ARR_CACHE.get(key)
+    if array is None:
+        array = np.zeros(shape, dtype=dtype)
+        array.flags.writeable = False
+        array = _ARR_CACHE.setdefault(key, array)
+    return array
+
 
 def arrays(
     dtype: Any,
     shape: Any,
     elements: Strategy | None = None,
+    *,
+    readonly: bool = False,
 ) -> Strategy:
     """Return a deterministic array strategy.
 
     The real Hypothesis implementation produces many varied examples.  Our
     lightweight stub only needs to return a single array instance that matches
-    the requested dtype and shape so downstream logic can execute.
+    the requested dtype and shape so downstream logic can execute.  With
+    ``readonly=True`` zero-filled examples share one non-writeable array per
+    shape and dtype instead of allocating a fresh one on every draw.
     """
 
     def _generator() -> np.ndarray:
@@ -35,6 +56,15 @@ def arrays(
         fill_value = 0
         if elements is not None:
             fill_value = _resolve(elements)
+        # Zero bytes only mean the same as a zero fill for numeric dtypes;
+        # strings would read '' rather than '0' and objects an int 0.
+        if (
+            np.dtype(dtype).kind in "biufc"
+            and type(fill_value) in (int, float, bool)
+            and fill_value == 0
+            and not np.signbit(fill_value)
+        ):
+            return _zeros(resolved_shape, dtype, readonly)
         return np.full(resolved_shape, fill_value, dtype=dtype)
 
     return Strategy(_generator)
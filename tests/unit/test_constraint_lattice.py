@@ -2,8 +2,13 @@
 """Unit tests for the :class:`ConstraintLattice` helper."""
 
 from constraint_lattice_core import ConstraintLattice
+import json
+import sys
+import time
 import unittest
 
+import numpy as np
+
 
 class TestConstraintLattice(unittest.TestCase):
     def test_acyclic_constraints(self) -> None:
@@ -62,6 +67,219 @@ class TestConstraintLattice(unittest.TestCase):
         self.assertEqual(lattice.nodes["C"], lattice.nodes["B"] + 1)
         self.assertEqual(lattice.nodes["B"], lattice.nodes["A"] + lattice.nodes["C"])
 
+    def test_numeric_constraints_match_generic_loop(self) -> None:
+        # The cycle is rank deficient, so both lattices fall through to the
+        # damped iteration instead of the linear solve.
+        def build(numeric: bool) -> ConstraintLattice:
+            lattice = ConstraintLattice()
+            lattice.nodes = {"A": 1.0, "B": 5.0}
+            if numeric:
+                lattice.register_numeric_constraint(
+                    lambda x: x + 1.0, inputs=["A"], outputs=["B"]
+                )
+                lattice.register_numeric_constraint(
+                    lambda x: x - 1.0, inputs=["B"], outputs=["A"]
+                )
+            else:
+                lattice.add_constraint(lambda a: a + 1.0, inputs=["A"], outputs=["B"])
+                lattice.add_constraint(lambda b: b - 1.0, inputs=["B"], outputs=["A"])
+            lattice.propagate()
+            return lattice
+
+        numeric, generic = build(True), build(False)
+        self.assertAlmostEqual(numeric.nodes["B"], numeric.nodes["A"] + 1.0, places=5)
+        self.assertAlmostEqual(numeric.nodes["A"], generic.nodes["A"], places=5)
+        self.assertAlmostEqual(numeric.nodes["B"], generic.nodes["B"], places=5)
+
+    def test_reducing_constraint_is_linearised_point_by_point(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 0.0, "B": 0.0, "C": 0.0}
+        lattice.add_constraint(lambda a, b: np.sum([a, b]), inputs=["A", "B"], outputs=["C"])
+        lattice.add_constraint(lambda c: 0.5 * c - 1, inputs=["C"], outputs=["A"])
+        lattice.add_constraint(lambda c: 0.25 * c, inputs=["C"], outputs=["B"])
+        lattice.propagate()
+
+        self.assertEqual(lattice.nodes["C"], -4.0)
+        self.assertEqual(lattice.nodes["C"], lattice.nodes["A"] + lattice.nodes["B"])
+
+    def test_wide_constraints_are_batched_or_evaluated_point_by_point(self) -> None:
+        xs = [f"x{i}" for i in range(64)]
+        for total in (lambda *a: sum(a), lambda *a: np.sum(a)):
+            lattice = ConstraintLattice()
+            lattice.nodes = {x: 0.0 for x in xs}
+            lattice.nodes["Y"] = 0.0
+            lattice.add_constraint(total, inputs=xs, outputs=["Y"])
+            for x in xs:
+                lattice.add_constraint(lambda y: 1.0 + y / 128, inputs=["Y"], outputs=[x])
+            lattice.propagate()
+
+            self.assertEqual(lattice.nodes["Y"], 128.0)
+            self.assertEqual(lattice.nodes["x0"], 2.0)
+
+    def test_long_chain_exceeds_recursion_limit(self) -> None:
+        length = sys.getrecursionlimit() + 500
+        lattice = ConstraintLattice()
+        lattice.nodes = {f"n{i}": 0.0 for i in range(length + 1)}
+        for i in range(length):
+            lattice.add_constraint(
+                lambda x: x + 1.0, inputs=[f"n{i}"], outputs=[f"n{i + 1}"]
+            )
+        lattice.propagate()
+
+        self.assertEqual(lattice.nodes[f"n{length}"], float(length))
+
+    def test_piecewise_linear_constraint_is_remeasured(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 5.0, "B": 0.0, "X": 4.0}
+        lattice.add_constraint(lambda a: max(a, 0.0), inputs=["A"], outputs=["B"])
+        lattice.add_constraint(lambda b, x: 0.5 * b + x, inputs=["B", "X"], outputs=["A"])
+        lattice.propagate()
+        self.assertEqual(lattice.nodes["B"], 8.0)
+
+        lattice.nodes.update({"A": -10.0, "X": -4.0})
+        lattice.propagate()
+
+        self.assertEqual(lattice.nodes["A"], -4.0)
+        self.assertEqual(lattice.nodes["B"], 0.0)
+
+    def test_nodes_behaves_like_a_dict(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.add_node("A", 1)
+        lattice.add_constraint(lambda a: a + 1, inputs=["A"], outputs=["B"])
+        self.assertEqual(dict(lattice.nodes), {"A": 1})
+        self.assertNotIn("B", lattice.nodes)
+
+        lattice.nodes = {"B": 2, "C": 3}
+        del lattice.nodes["C"]
+        self.assertEqual(lattice.nodes, {"B": 2})
+        with self.assertRaises(KeyError):
+            lattice.nodes["A"]
+
+    def test_nodes_is_the_dict_it_was_given(self) -> None:
+        nodes = {"A": 1, "B": 0}
+        lattice = ConstraintLattice()
+        lattice.nodes = nodes
+        lattice.add_constraint(lambda a: a + 1, inputs=["A"], outputs=["B"])
+        lattice.propagate()
+
+        self.assertIs(lattice.nodes, nodes)
+        self.assertEqual(nodes, {"A": 1, "B": 2.0})
+        self.assertEqual(json.loads(json.dumps(lattice.nodes)), nodes)
+        self.assertEqual(lattice.nodes | {"C": 3}, {"A": 1, "B": 2.0, "C": 3})
+
+    def test_parallel_propagation_matches_sequential(self) -> None:
+        def build() -> ConstraintLattice:
+            lattice = ConstraintLattice()
+            lattice.nodes = {"root": 1.0}
+            for i in range(8):
+                a, b, out = f"a{i}", f"b{i}", f"out{i}"
+                lattice.nodes.update({a: 0.0, b: float(i), out: 0.0})
+                lattice.add_constraint(lambda r, x: r + x, inputs=["root", b], outputs=[a])
+                lattice.add_constraint(lambda x: x - 1.0, inputs=[a], outputs=[b])
+                lattice.add_constraint(lambda x: x * 2, inputs=[a], outputs=[out])
+            return lattice
+
+        sequential, parallel = build(), build()
+        sequential.propagate()
+        parallel.propagate(max_workers=4)
+
+        self.assertEqual(dict(parallel.nodes), dict(sequential.nodes))
+
+        def build_shared_output() -> ConstraintLattice:
+            lattice = ConstraintLattice()
+            lattice.nodes = {"A": 1, "B": 2, "X": 0}
+            lattice.add_constraint(lambda a: a, inputs=["A"], outputs=["X"])
+            # The slow writer is scheduled first; racing it would let it
+            # overwrite the result of the writer that sequentially runs last.
+            lattice.add_constraint(
+                lambda b: time.sleep(0.01) or b, inputs=["B"], outputs=["X"]
+            )
+            return lattice
+
+        sequential, parallel = build_shared_output(), build_shared_output()
+        sequential.propagate()
+        parallel.propagate(max_workers=2)
+
+        self.assertEqual(sequential.nodes["X"], 1.0)
+        self.assertEqual(dict(parallel.nodes), dict(sequential.nodes))
+
+    def test_linear_constraints_solve_without_evaluation(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 0.0, "B": 0.0, "C": 3.0}
+        lattice.add_linear_constraint({"B": 1.0, "C": 1.0}, -1.0, outputs=["A"])
+        lattice.add_linear_constraint({"A": 0.5}, outputs=["B"])
+        lattice.propagate()
+
+        self.assertAlmostEqual(lattice.nodes["A"], lattice.nodes["B"] + 3.0 - 1.0)
+        self.assertAlmostEqual(lattice.nodes["B"], 0.5 * lattice.nodes["A"])
+
+    def test_least_squares_rejects_non_finite_tall_system(self) -> None:
+        A = np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+        b = np.array([1.0, np.nan, 2.0])
+        with self.assertRaises((ValueError, np.linalg.LinAlgError)):
+            ConstraintLattice._least_squares(A, b)
+
+    def test_topology_is_reused_until_constraints_change(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 1, "B": 0, "C": 0}
+        lattice.add_constraint(lambda a: a * 2, inputs=["A"], outputs=["B"])
+        lattice.add_constraint(lambda b: b + 1, inputs=["B"], outputs=["C"])
+        lattice.propagate()
+        topology = lattice._topology()
+
+        lattice.nodes["A"] = 3
+        lattice.propagate()
+        self.assertIs(lattice._topology(), topology)
+        self.assertEqual(lattice.nodes["C"], 7)
+
+        lattice.add_node("D", 0)
+        lattice.add_constraint(lambda c: c * 10, inputs=["C"], outputs=["D"])
+        lattice.propagate()
+        self.assertIsNot(lattice._topology(), topology)
+        self.assertEqual(lattice.nodes["D"], 70)
+
+    def test_isolated_constraint_is_applied(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 2, "B": None}
+        lattice.add_constraint(lambda a: a * 3, inputs=["A"], outputs=["B"])
+        lattice.propagate()
+
+        self.assertEqual(lattice.nodes["B"], 6)
+
+    def test_single_output_constraint_is_evaluated_once(self) -> None:
+        calls = []
+
+        def label(b: float) -> str:
+            calls.append(b)
+            return "big" if b > 1.5 else "small"
+
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 1.0, "B": 0.0, "S": "?"}
+        lattice.add_constraint(lambda a: a * 2, inputs=["A"], outputs=["B"])
+        lattice.add_constraint(label, inputs=["B"], outputs=["S"])
+        lattice.propagate()
+
+        self.assertEqual(calls, [2.0])
+        self.assertEqual(lattice.nodes["S"], "big")
+
+    def test_single_output_constraint_uses_first_returned_value(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 1.0, "B": 0.0}
+        lattice.add_constraint(lambda a: (a + 1, a + 2), inputs=["A"], outputs=["B"])
+        lattice.propagate()
+
+        self.assertEqual(lattice.nodes["B"], 2.0)
+
+    def test_rank_deficient_cycle_starts_from_nearest_solution(self) -> None:
+        lattice = ConstraintLattice()
+        lattice.nodes = {"A": 1, "B": 5}
+        lattice.add_constraint(lambda a: a + 1, inputs=["A"], outputs=["B"])
+        lattice.add_constraint(lambda b: b - 1, inputs=["B"], outputs=["A"])
+        lattice.propagate()
+
+        self.assertEqual(lattice.nodes["A"], 2.5)
+        self.assertEqual(lattice.nodes["B"], 3.5)
+
 
 if __name__ == "__main__":
     unittest.main()
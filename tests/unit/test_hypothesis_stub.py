@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: MPL-2.0
+"""Tests for the in-repo ``hypothesis`` stub."""
+import numpy as np
+
+from hypothesis import Strategy, given
+from hypothesis import strategies as st
+from hypothesis.extra.numpy import arrays
+
+
+def _counting(volatile: bool) -> tuple[Strategy, list[int]]:
+    draws: list[int] = []
+
+    def generate() -> int:
+        draws.append(len(draws))
+        return draws[-1]
+
+    return Strategy(generate, volatile=volatile), draws
+
+
+def test_readonly_zero_arrays_share_one_buffer():
+    strategy = arrays(np.float64, (2, 3), readonly=True)
+    first, second = strategy(), strategy()
+
+    assert first is second
+    assert not first.flags.writeable
+    assert first.shape == (2, 3)
+    assert first.dtype == np.float64
+    assert not first.any()
+
+
+def test_writable_zero_arrays_are_fresh():
+    strategy = arrays(np.int32, 4)
+    first, second = strategy(), strategy()
+
+    assert first is not second
+    assert first.flags.writeable
+    first[0] = 7
+    assert second[0] == 0
+
+
+def test_non_numeric_and_negative_zero_fills_use_full():
+    # Zero bytes would read back as '' rather than the '0' ``np.full`` gives.
+    strings = arrays("U1", 3, readonly=True)()
+    assert strings.tolist() == ["0", "0", "0"]
+
+    negative = arrays(np.float64, 2, elements=-0.0, readonly=True)()
+    assert np.signbit(negative).all()
+    assert negative.flags.writeable
+
+
+def test_given_draws_constant_strategies_once():
+    constant, constant_draws = _counting(volatile=False)
+    fresh, fresh_draws = _counting(volatile=True)
+    keyword, keyword_draws = _counting(volatile=True)
+    seen = []
+
+    @given(constant, fresh, k=keyword)
+    def check(c, f, k):
+        seen.append((c, f, k))
+
+    assert constant_draws == [0]
+    assert fresh_draws == keyword_draws == []
+
+    check()
+    check()
+
+    assert seen == [(0, 0, 0), (0, 1, 1)]
+    assert constant_draws == [0]
+    assert fresh_draws == keyword_draws == [0, 1]
+
+
+def test_given_without_volatile_strategies_passes_caller_arguments():
+    constant, draws = _counting(volatile=False)
+
+    @given(value=constant)
+    def check(prefix, value):
+        return prefix, value
+
+    assert check("a") == ("a", 0)
+    assert check("b") == ("b", 0)
+    assert draws == [0]
+
+
+def test_lists_of_sampled_values_are_fresh_per_draw():
+    population = ["x", "y"]
+    strategy = st.lists(st.sampled_from(population), min_size=3)
+    population[0] = "z"
+
+    first, second = strategy(), strategy()
+
+    assert first == second == ["x", "x", "x"]
+    assert first is not second
+    first.append("w")
+    assert strategy() == ["x", "x", "x"]
+
+
+def test_lists_redraw_volatile_elements():
+    element, draws = _counting(volatile=True)
+    strategy = st.lists(element, min_size=5, max_size=2)
+
+    assert strategy() == [0, 1]
+    assert strategy() == [2, 3]
+    assert len(draws) == 4
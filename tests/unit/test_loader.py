@@ -0,0 +1,183 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (c) 2025 ochoaughini. See LICENSE for full terms.
+"""Tests for the YAML/JSON constraint loader."""
+
+import math
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from constraint_lattice.engine import loader
+from constraint_lattice.engine.loader import _load_yaml
+
+
+def _write(tmp_path: Path, name: str, content: str) -> Path:
+    path = tmp_path / name
+    path.write_text(textwrap.dedent(content))
+    return path
+
+
+def test_invalid_yaml_escapes_are_kept_literal(tmp_path):
+    path = _write(
+        tmp_path,
+        "escapes.yaml",
+        r"""
+        windows: "C:\dir\query"
+        newline: "a\nb"
+        """,
+    )
+    assert _load_yaml(str(path)) == {"windows": r"C:\dir\query", "newline": "a\nb"}
+
+
+def test_yaml_without_backslashes_loads_unchanged(tmp_path):
+    path = _write(tmp_path, "plain.yaml", "profiles:\n  default: [A, B]\n")
+    assert _load_yaml(str(path)) == {"profiles": {"default": ["A", "B"]}}
+
+
+def test_yaml_documents_are_cached_until_the_file_changes(tmp_path, monkeypatch):
+    path = _write(tmp_path, "cached.yaml", "profiles:\n  default: [A]\n")
+    parses = []
+    parse_yaml = loader._parse_yaml
+    monkeypatch.setattr(
+        loader, "_parse_yaml", lambda path: parses.append(path) or parse_yaml(path)
+    )
+
+    first = _load_yaml(str(path))
+    first["profiles"]["default"].append("mutated")
+    assert _load_yaml(str(path)) == {"profiles": {"default": ["A"]}}
+    assert len(parses) == 1
+
+    path.write_text("profiles:\n  default: [A, B]\n")
+    assert _load_yaml(str(path)) == {"profiles": {"default": ["A", "B"]}}
+    assert len(parses) == 2
+
+
+def test_constraint_classes_are_cached_and_misses_retried(monkeypatch):
+    imports = []
+    import_module = loader.importlib.import_module
+    monkeypatch.setattr(
+        loader.importlib,
+        "import_module",
+        lambda name: imports.append(name) or import_module(name),
+    )
+    monkeypatch.setattr(loader, "_CLASS_CACHE", {})
+
+    cls = loader.load_constraint_class("collections.OrderedDict")
+    assert loader.load_constraint_class("collections.OrderedDict") is cls
+    for _ in range(2):
+        with pytest.raises(ImportError) as excinfo:
+            loader.load_constraint_class("collections.DoesNotExist")
+        assert isinstance(excinfo.value.__cause__, AttributeError)
+    assert imports == ["collections"] * 3
+
+
+def test_includes_are_loaded_once_and_cycles_terminate(tmp_path, monkeypatch):
+    _write(
+        tmp_path,
+        "root.yaml",
+        """
+        version: "1"
+        includes: [left.yaml, right.yaml]
+        constraints:
+          - {name: root, type: text}
+        """,
+    )
+    for side in ("left", "right"):
+        _write(
+            tmp_path,
+            f"{side}.yaml",
+            f"""
+            version: "1"
+            includes: [shared.yaml]
+            constraints:
+              - {{name: {side}, type: text}}
+            """,
+        )
+    _write(
+        tmp_path,
+        "shared.yaml",
+        """
+        version: "1"
+        includes: [root.yaml]
+        constraints:
+          - {name: shared, type: text}
+        """,
+    )
+    loads = []
+    load_yaml = loader._load_yaml
+    monkeypatch.setattr(
+        loader, "_load_yaml", lambda path: loads.append(Path(path).name) or load_yaml(path)
+    )
+
+    constraints = loader.load_constraints_from_file(str(tmp_path / "root.yaml"))
+
+    assert [c.name for c in constraints] == ["root", "left", "shared", "right"]
+    assert sorted(loads) == ["left.yaml", "right.yaml", "root.yaml", "shared.yaml"]
+
+
+def test_input_hash_covers_the_constraint_configuration(tmp_path):
+    path = _write(
+        tmp_path,
+        "hashes.json",
+        '{"version": "1", "constraints": ['
+        '{"name": "a", "type": "text", "params": {"x": 1}},'
+        '{"name": "b", "type": "text", "params": {"x": 2}}]}',
+    )
+    first = loader.load_constraints_from_file(str(path))
+    second = loader.load_constraints_from_file(str(path))
+
+    assert [c.input_hash for c in first] == [c.input_hash for c in second]
+    assert first[0].input_hash != first[1].input_hash
+    assert all(len(c.input_hash) == 64 for c in first)
+
+
+def test_input_hash_accepts_non_json_yaml_values(tmp_path):
+    path = _write(
+        tmp_path,
+        "dates.yaml",
+        """
+        version: "1"
+        constraints:
+          - {name: a, type: text, params: {since: 2024-01-02}}
+        """,
+    )
+    (constraint,) = loader.load_constraints_from_file(str(path))
+    assert len(constraint.input_hash) == 64
+
+
+def test_compiled_profiles_are_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = _write(
+        tmp_path,
+        "profiles.yaml",
+        """
+        profiles:
+          default:
+            - {class: collections.OrderedDict, params: {items: [1]}}
+        """,
+    )
+    loads = []
+    load_yaml = loader._load_yaml
+    monkeypatch.setattr(
+        loader, "_load_yaml", lambda path: loads.append(path) or load_yaml(path)
+    )
+
+    first = loader.load_constraints_from_yaml(str(path))
+    first[0]["items"].append("mutated")
+    second = loader.load_constraints_from_yaml(str(path))
+    assert second == [{"items": [1]}]
+    assert second[0] is not first[0]
+    assert len(loads) == 1
+
+    path.write_text("profiles:\n  default:\n    - collections.OrderedDict\n")
+    assert loader.load_constraints_from_yaml(str(path)) == [{}]
+    assert len(loads) == 2
+
+
+def test_json_configs_accept_what_the_stdlib_accepts():
+    data = b'{"limit": NaN, "big": 123456789012345678901234567890}'
+    parsed = loader._json_loads(data)
+    assert parsed["big"] == 123456789012345678901234567890
+    assert math.isnan(parsed["limit"])
+    with pytest.raises(ValueError):
+        loader._json_loads(b"{not json")
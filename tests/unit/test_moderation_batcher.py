@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (c) 2025 ochoaughini. See LICENSE for full terms.
+"""Tests for the API's dynamic moderation batching queue."""
+
+import asyncio
+import threading
+
+from api.main import ModerationBatcher
+
+
+class _RecordingModerator:
+    def __init__(self):
+        self.batches = []
+
+    def apply_constraints_batch(self, texts):
+        self.batches.append(list(texts))
+        return [(text != "bad", "flagged" if text == "bad" else None) for text in texts]
+
+
+def test_concurrent_requests_share_one_batch():
+    moderator = _RecordingModerator()
+    batcher = ModerationBatcher(lambda: moderator, window_seconds=0.05)
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(text) for text in ["ok", "bad", "fine"])
+            )
+        finally:
+            await batcher.close()
+
+    results = asyncio.run(run())
+
+    assert moderator.batches == [["ok", "bad", "fine"]]
+    assert results == [(True, None), (False, "flagged"), (True, None)]
+
+
+def test_batches_respect_max_batch_size():
+    moderator = _RecordingModerator()
+    batcher = ModerationBatcher(
+        lambda: moderator, max_batch_size=2, window_seconds=0.05
+    )
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(str(i)) for i in range(5))
+            )
+        finally:
+            await batcher.close()
+
+    results = asyncio.run(run())
+
+    assert [len(batch) for batch in moderator.batches] == [2, 2, 1]
+    assert results == [(True, None)] * 5
+
+
+def test_close_fails_requests_still_waiting():
+    release = threading.Event()
+
+    class _BlockingModerator:
+        def apply_constraints_batch(self, texts):
+            release.wait()
+            return [(True, None) for _ in texts]
+
+    batcher = ModerationBatcher(
+        _BlockingModerator, max_batch_size=1, window_seconds=0.0
+    )
+
+    async def run():
+        requests = [
+            asyncio.ensure_future(batcher.submit(text)) for text in ["a", "b"]
+        ]
+        await asyncio.sleep(0.05)  # "a" is in flight, "b" still queued
+        await batcher.close()
+        release.set()
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 2
+    for result in results:
+        assert isinstance(result, RuntimeError)
+
+
+def test_short_verdict_list_fails_the_batch():
+    class _ShortModerator:
+        def apply_constraints_batch(self, texts):
+            return [(True, None)]
+
+    batcher = ModerationBatcher(_ShortModerator, window_seconds=0.05)
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(text) for text in ["a", "b"]),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.close()
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
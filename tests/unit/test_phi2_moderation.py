@@ -73,3 +73,49 @@ def test_regenerate_strategy(moderator):
     ):
         moderated = moderator.moderate("You are stupid!")
         assert moderated == "Let's keep things civil."
+
+
+def test_model_is_loaded_once_per_configuration(monkeypatch):
+    from constraint_lattice.constraints import phi2_moderation
+
+    loads = []
+
+    class _FakeModel:
+        def to(self, device):
+            return self
+
+    class _AutoModel:
+        @staticmethod
+        def from_pretrained(name, **kwargs):
+            loads.append(name)
+            return _FakeModel()
+
+    class _FakeTokenizer:
+        eos_token = "<eos>"  # noqa: S105 - not a credential
+        pad_token = None
+        padding_side = "right"
+
+        def encode(self, text, add_special_tokens=True):
+            return [len(text)]
+
+    class _AutoTokenizer:
+        @staticmethod
+        def from_pretrained(name, **kwargs):
+            return _FakeTokenizer()
+
+    monkeypatch.setenv("CL_USE_PHI2", "1")
+    monkeypatch.setattr(phi2_moderation, "AutoModelForCausalLM", _AutoModel)
+    monkeypatch.setattr(phi2_moderation, "AutoTokenizer", _AutoTokenizer)
+    phi2_moderation._load_phi2.cache_clear()
+    try:
+        first = phi2_moderation.ConstraintPhi2Moderation(device="cpu")
+        second = phi2_moderation.ConstraintPhi2Moderation(device="cpu")
+    finally:
+        phi2_moderation._load_phi2.cache_clear()
+
+    assert loads == ["microsoft/phi-2"]
+    assert first.model is second.model
+    assert first.tokenizer is second.tokenizer
+    assert first._unsafe_id == 6
+    assert first.tokenizer.pad_token == "<eos>"  # noqa: S105
+    assert first.tokenizer.padding_side == "left"
@@ -3,6 +3,8 @@
 # Copyright (c) 2025 ochoaughini. See LICENSE for full terms.
 # Copyright (c) 2025 ochoaughini. See LICENSE for full terms.
 """Tests for SemanticSimilarityGuard."""
+import numpy as np
+
 from constraint_lattice.constraints.semantic_similarity_guard import (
     SemanticSimilarityGuard,
 )
@@ -27,3 +29,62 @@ def test_idempotent(text):
     first = guard.filter_constraint("p", text)
     second = guard.filter_constraint("p", first)
     assert first == second
+
+
+def test_zero_vector_input_has_zero_similarity():
+    # The empty string encodes to the zero vector.
+    guard = SemanticSimilarityGuard(reference="hello world", tau=0.1)
+    assert guard.apply("") is False
+    assert guard.apply_many(["", "hello world"]).tolist() == [False, True]
+
+
+def test_reference_norm_is_precomputed(monkeypatch):
+    guard = SemanticSimilarityGuard(reference="hello world")
+    ref = guard.reference_vector
+    assert ref.dtype == np.int64
+    assert guard._reference_sqnorm == float(ref @ ref)
+
+    monkeypatch.setattr(
+        SemanticSimilarityGuard,
+        "_load_encoder",
+        lambda self: lambda text: np.full(4, 3.0, dtype=np.float32),
+    )
+    guard = SemanticSimilarityGuard(reference="hello world")
+    assert np.isclose(np.linalg.norm(guard.reference_vector), 1.0)
+    assert guard._reference_sqnorm == 1.0
+
+
+def test_apply_many_matches_apply():
+    guard = SemanticSimilarityGuard(reference="hello world", tau=0.9)
+    texts = ["hello world", "totally different", "", "hello world again"]
+    verdicts = guard.apply_many(texts)
+    assert verdicts.dtype == bool
+    assert verdicts.tolist() == [guard.apply(text) for text in texts]
+
+
+def test_fallback_encode_without_numba_matches(monkeypatch):
+    from constraint_lattice.constraints import semantic_similarity_guard
+
+    texts = ["", "a", "hello world", "ünïcödé ✓" * 40]
+    expected = [SemanticSimilarityGuard._fallback_encode(text) for text in texts]
+    monkeypatch.setattr(semantic_similarity_guard, "_accumulate_kernel", lambda: None)
+    for text, vector in zip(texts, expected, strict=True):
+        np.testing.assert_array_equal(
+            SemanticSimilarityGuard._fallback_encode(text), vector
+        )
+
+
+def test_repeated_text_is_encoded_once():
+    guard = SemanticSimilarityGuard(reference="hello world", tau=0.5)
+    calls = []
+    encoder = guard._encoder
+
+    def counting_encoder(text):
+        calls.append(text)
+        return encoder(text)
+
+    guard._encoder = counting_encoder
+    for _ in range(3):
+        guard.apply("hello again")
+    guard.apply_many(["hello again", "bye"])
+    assert calls == ["hello again", "bye"]